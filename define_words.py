@@ -1,35 +1,143 @@
 import csv
 import json
 import os
+import random
+import sqlite3
 import time
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
-import urllib.request
+import email.utils
+import http.client
 import urllib.error
+import urllib.parse
+
+try:
+    import orjson  # optional, faster JSON parsing
+except ImportError:
+    orjson = None
+
+
+API_HOST = "api.dictionaryapi.dev"
+API_PATH = "/api/v2/entries/en/{}"
+
+# Statuses worth retrying; anything else besides 404 is treated as fatal
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Upper bound on any single wait between retries, in seconds
+MAX_BACKOFF_SEC = 30.0
+# Sanity cap on a server-given Retry-After wait; shorter than what the server asks would just get refused again
+MAX_RETRY_AFTER_SEC = 600.0
+
+# Cached API responses older than this are fetched again
+CACHE_TTL_SEC = 30 * 24 * 3600
+# Commit cache inserts in batches rather than once per word
+CACHE_COMMIT_EVERY = 100
+
+OUTPUT_HEADER = ["Word", "Phonetic", "POS", "Definition", "Example"]
+# Flush the output CSV every this many rows so an interrupted run keeps its progress
+FLUSH_EVERY = 50
+
+# One keep-alive connection per worker thread, reused across words
+_local = threading.local()
+
+
+class RateLimiter:
+    """Thread-safe token bucket: bursts of up to `max_rate` requests, refilled evenly over `period` seconds."""
+
+    def __init__(self, max_rate: float, period: float = 60.0) -> None:
+        # Hold at least one whole token, or rates below one per period could never be served
+        self.capacity = max(1.0, max_rate)
+        self.fill_rate = max_rate / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                # `updated` sits in the future while paused, so no tokens accrue until the pause ends
+                self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated) * self.fill_rate)
+                self.updated = max(self.updated, now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.fill_rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. when the server sends Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.updated = self.paused_until
+
+
+def get_connection(timeout: float) -> http.client.HTTPSConnection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = http.client.HTTPSConnection(API_HOST, timeout=timeout)
+        _local.conn = conn
+    return conn
+
+
+def drop_connection() -> None:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def http_get(path: str, timeout: float = 10.0) -> Optional[bytes]:
+    conn = get_connection(timeout)
+    try:
+        conn.request("GET", path, headers={"User-Agent": "word-fetcher/1.0"})
+        resp = conn.getresponse()
+        data = resp.read()
+    except (OSError, http.client.HTTPException):
+        # Broken or timed-out connection; reconnect on the next request
+        drop_connection()
+        raise
+    if resp.will_close:
+        drop_connection()
+    # 404 means word not found; treat as None
+    if resp.status == 404:
+        return None
+    # Only 2xx is a real answer; redirects are not followed, so they count as errors too
+    if not 200 <= resp.status < 300:
+        raise urllib.error.HTTPError(f"https://{API_HOST}{path}", resp.status, resp.reason, resp.headers, None)
+    return data
 
 
-API_URL = "https://api.dictionaryapi.dev/api/v2/entries/en/{}"
-
-
-def http_get(url: str, timeout: float = 10.0) -> Optional[bytes]:
-    req = urllib.request.Request(url, headers={"User-Agent": "word-fetcher/1.0"})
+def retry_after_seconds(headers) -> Optional[float]:
+    """Seconds to wait per a Retry-After header (delta-seconds or HTTP-date), if any."""
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            return resp.read()
-    except urllib.error.HTTPError as e:
-        # 404 means word not found; treat as None
-        if e.code == 404:
-            return None
-        raise
-    except urllib.error.URLError:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
         return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base_sec: float) -> float:
+    """Capped exponential backoff with full jitter, so concurrent retries spread out."""
+    return random.uniform(0, min(MAX_BACKOFF_SEC, base_sec * (2 ** attempt)))
 
 
 def parse_response(data: bytes) -> list[dict]:
+    # Both parsers take bytes directly; their decode errors subclass ValueError
     try:
-        obj = json.loads(data.decode("utf-8"))
-    except Exception:
+        obj = orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError:
         return []
     if not isinstance(obj, list):
         return []
@@ -62,6 +170,29 @@ def extract_first_sense(entry_list: list[dict]) -> tuple[str, str, str, str]:
     return phonetic, pos, definition, example
 
 
+def open_cache(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE IF NOT EXISTS cache (word TEXT PRIMARY KEY, status INTEGER, body BLOB, ts REAL)")
+    return conn
+
+
+def cache_get(conn: sqlite3.Connection, word: str) -> Optional[tuple[int, bytes]]:
+    row = conn.execute(
+        "SELECT status, body FROM cache WHERE word = ? AND ts > ?",
+        (word.lower(), time.time() - CACHE_TTL_SEC),
+    ).fetchone()
+    if row is None:
+        return None
+    return row[0], row[1]
+
+
+def cache_put(conn: sqlite3.Connection, word: str, status: int, body: bytes) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO cache (word, status, body, ts) VALUES (?, ?, ?, ?)",
+        (word.lower(), status, body, time.time()),
+    )
+
+
 def load_words(path: str) -> list[str]:
     words: list[str] = []
     with open(path, "r", encoding="utf-8") as f:
@@ -90,13 +221,28 @@ def load_done(path: str) -> set[str]:
     return done
 
 
-def append_result(path: str, word: str, phonetic: str, pos: str, definition: str, example: str) -> None:
-    exists = os.path.exists(path)
-    with open(path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        if not exists:
-            writer.writerow(["Word", "Phonetic", "POS", "Definition", "Example"])
-        writer.writerow([word, phonetic, pos, definition, example])
+def fetch_word(path: str, limiter: RateLimiter, delay_sec: float, max_retries: int) -> Optional[tuple[int, bytes]]:
+    # Returns (200, body) on success, (404, b"") if the API has no entry, None if every attempt failed
+    for attempt in range(1, max_retries + 1):
+        limiter.acquire()
+        try:
+            data = http_get(path)
+            if data is None:
+                return 404, b""
+            return 200, data
+        except urllib.error.HTTPError as e:
+            if e.code not in RETRY_STATUSES:
+                raise
+            wait = retry_after_seconds(e.headers)
+            if wait is not None:
+                # The server said when to come back; hold all workers, not just this one
+                limiter.pause(min(wait, MAX_RETRY_AFTER_SEC))
+                continue
+        except (OSError, http.client.HTTPException):
+            pass
+        if attempt < max_retries:
+            time.sleep(backoff_delay(attempt, delay_sec))
+    return None
 
 
 def fetch_definitions(
@@ -105,36 +251,77 @@ def fetch_definitions(
     limit: Optional[int] = None,
     delay_sec: float = 0.3,
     max_retries: int = 3,
+    workers: int = 20,
+    rate_per_min: float = 90.0,
+    cache_path: Optional[str] = "defs_cache.sqlite",
 ) -> None:
     words = load_words(input_csv)
     done = load_done(output_csv)
 
-    fetched = 0
+    # Drop finished words and repeats up front, so a resumed run only walks new work
+    pending: list[str] = []
+    seen = set(done)
     for word in words:
         key = word.lower()
-        if key in done:
-            continue
-        if limit is not None and fetched >= limit:
-            break
-
-        attempt = 0
-        resp: Optional[bytes] = None
-        while attempt < max_retries and resp is None:
-            attempt += 1
-            resp = http_get(API_URL.format(urllib.parse.quote(word)))
-            if resp is None:
-                time.sleep(delay_sec * attempt)
-
-        phonetic = pos = definition = example = ""
-        if resp:
-            entries = parse_response(resp)
-            phonetic, pos, definition, example = extract_first_sense(entries)
-
-        append_result(output_csv, word, phonetic, pos, definition, example)
-        fetched += 1
-        time.sleep(delay_sec)
-
-    print(f"Wrote {fetched} definitions to {output_csv}")
+        if key not in seen:
+            seen.add(key)
+            pending.append(word)
+    if limit is not None:
+        pending = pending[:limit]
+
+    cache = open_cache(cache_path) if cache_path else None
+    out = open(output_csv, "a", newline="", encoding="utf-8")
+    writer = csv.writer(out)
+    if os.path.getsize(output_csv) == 0:
+        writer.writerow(OUTPUT_HEADER)
+
+    limiter = RateLimiter(rate_per_min, 60.0)
+    fetched = 0
+    stored = 0
+    try:
+        # Cache reads and writes stay on this thread; workers only do HTTP
+        cached: dict[str, tuple[int, bytes]] = {}
+        if cache is not None:
+            for word in pending:
+                hit = cache_get(cache, word)
+                if hit is not None:
+                    cached[word] = hit
+        # URL-encode each word once; retries reuse the same path
+        to_fetch = [API_PATH.format(urllib.parse.quote(w)) for w in pending if w not in cached]
+
+        # Requests run concurrently (at most `workers` in flight); results are written
+        # here, one at a time and in input order, so the CSV is never written from two threads.
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = pool.map(lambda path: fetch_word(path, limiter, delay_sec, max_retries), to_fetch)
+            for word in pending:
+                if word in cached:
+                    result = cached[word]
+                else:
+                    result = next(results)
+                    # Not-found answers are cached too; failed lookups are not cached, but they still
+                    # get a blank row below, which marks them done for later runs of this output CSV
+                    if result is not None and cache is not None:
+                        cache_put(cache, word, *result)
+                        stored += 1
+                        if stored % CACHE_COMMIT_EVERY == 0:
+                            cache.commit()
+
+                phonetic = pos = definition = example = ""
+                if result is not None and result[1]:
+                    entries = parse_response(result[1])
+                    phonetic, pos, definition, example = extract_first_sense(entries)
+
+                writer.writerow([word, phonetic, pos, definition, example])
+                fetched += 1
+                if fetched % FLUSH_EVERY == 0:
+                    out.flush()
+    finally:
+        out.close()
+        if cache is not None:
+            cache.commit()
+            cache.close()
+
+    print(f"Wrote {fetched} definitions to {output_csv} ({len(cached)} from cache)")
 
 
 def main() -> None:
@@ -142,9 +329,14 @@ def main() -> None:
     parser.add_argument("--input", default="difficult_words.csv", help="Input CSV (default: difficult_words.csv)")
     parser.add_argument("--output", default="difficult_words_with_defs.csv", help="Output CSV")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of words to fetch (for testing)")
-    parser.add_argument("--delay", type=float, default=0.3, help="Delay between requests in seconds")
+    parser.add_argument("--delay", type=float, default=0.3, help="Base delay between retries in seconds")
     parser.add_argument("--retries", type=int, default=3, help="Max retries per word")
+    parser.add_argument("--workers", type=int, default=20, help="Max concurrent requests (default: 20)")
+    parser.add_argument("--rate", type=float, default=90.0, help="Max requests per minute (default: 90)")
+    parser.add_argument("--cache", default="defs_cache.sqlite", help="SQLite cache of API responses ('' to disable)")
     args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
 
     fetch_definitions(
         input_csv=args.input,
@@ -152,6 +344,9 @@ def main() -> None:
         limit=args.limit,
         delay_sec=args.delay,
         max_retries=args.retries,
+        workers=args.workers,
+        rate_per_min=args.rate,
+        cache_path=args.cache,
     )
 
 
@@ -1,18 +1,33 @@
 import csv
+import functools
 import re
 import glob
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import Iterator
 
 
+# Patterns used by normalize_word, compiled once at import
+_POSSESSIVE = re.compile(r"(’s|'s)$")
+_HYPHEN_WS = re.compile(r"\s*-[\s-]*")
+# Byte table mapping everything except a-z and hyphen to a space
+_KEEP = set(b"abcdefghijklmnopqrstuvwxyz-")
+_ALPHA_TABLE = bytes(c if c in _KEEP else 0x20 for c in range(256))
+
+
+@functools.lru_cache(maxsize=200_000)
 def normalize_word(raw: str) -> str:
     """Lowercase, keep letters and internal hyphens, strip possessive, and tidy."""
-    lowered = raw.lower()
+    # trim first so the end-anchored possessive pattern sees the real end of the word
+    lowered = raw.strip().lower()
     # strip trailing possessive 's or ’s
-    lowered = re.sub(r"(’s|'s)$", "", lowered)
-    # keep a-z and hyphen only
-    cleaned = re.sub(r"[^a-z-]", " ", lowered)
+    lowered = _POSSESSIVE.sub("", lowered)
+    # keep a-z and hyphen only; non-ASCII chars become "?" and then a space, like any other char
+    cleaned = lowered.encode("ascii", "replace").translate(_ALPHA_TABLE).decode("ascii")
     # collapse multiple hyphens/spaces around hyphens
-    cleaned = re.sub(r"\s*-+\s*", "-", cleaned)
+    cleaned = _HYPHEN_WS.sub("-", cleaned)
     cleaned = cleaned.strip("-").strip()
     return cleaned
 
@@ -27,10 +42,10 @@ def parse_word_results(path: str) -> list[tuple[str, float]]:
         # Detect delimiter: prefer tab if present, else split on whitespace
         if "\t" in header_line:
             header_parts = [h.strip() for h in header_line.strip().split("\t")]
-            splitter = "\t"
+            rows = csv.reader(file_handle, delimiter="\t", quoting=csv.QUOTE_NONE)
         else:
             header_parts = header_line.strip().split()
-            splitter = None  # means use .split() later
+            rows = (line.split() for line in file_handle)
 
         # Identify column indices. Use 'Headword' if present, else fallback to 'Type'.
         try:
@@ -42,16 +57,7 @@ def parse_word_results(path: str) -> list[tuple[str, float]]:
         headword_idx = header_parts.index("Headword") if "Headword" in header_parts else None
         type_idx = header_parts.index("Type") if "Type" in header_parts else 0
 
-        for line in file_handle:
-            line = line.strip()
-            if not line:
-                continue
-
-            if splitter:
-                parts = [p.strip() for p in line.split(splitter)]
-            else:
-                parts = line.split()
-
+        for parts in rows:
             if not parts:
                 continue
 
@@ -75,11 +81,12 @@ def parse_word_results(path: str) -> list[tuple[str, float]]:
                 continue
 
             # Choose the word column: prefer Headword if present and non-empty, else Type
+            # csv.reader leaves tab fields unstripped, so trim the chosen one here
             word_raw = None
-            if headword_idx is not None and len(parts) > headword_idx and parts[headword_idx]:
-                word_raw = parts[headword_idx]
+            if headword_idx is not None and len(parts) > headword_idx and parts[headword_idx].strip():
+                word_raw = parts[headword_idx].strip()
             elif type_idx is not None and len(parts) > type_idx:
-                word_raw = parts[type_idx]
+                word_raw = parts[type_idx].strip()
 
             if not word_raw:
                 continue
@@ -93,7 +100,7 @@ def parse_word_results(path: str) -> list[tuple[str, float]]:
     return words_and_freqs
 
 
-def load_ngsl_set(path: str) -> set[str]:
+def load_ngsl_set(path: str) -> frozenset[str]:
     ngsl: set[str] = set()
     with open(path, "r", encoding="utf-8") as csv_file:
         reader = csv.reader(csv_file)
@@ -104,113 +111,118 @@ def load_ngsl_set(path: str) -> set[str]:
             lemma = row[0].strip().lower()
             if lemma:
                 ngsl.add(lemma)
-    return ngsl
+    return frozenset(ngsl)
+
+
+# Irregulars and pronouns mapping (single authoritative table)
+_IRREGULAR_MAP: dict[str, str] = {
+    "was": "be",
+    "were": "be",
+    "been": "be",
+    "am": "be",
+    "is": "be",
+    "are": "be",
+    "has": "have",
+    "had": "have",
+    "did": "do",
+    "done": "do",
+    "does": "do",
+    "said": "say",
+    "made": "make",
+    "went": "go",
+    "gone": "go",
+    "goes": "go",
+    "got": "get",
+    "gotten": "get",
+    "came": "come",
+    "come": "come",
+    "told": "tell",
+    "saw": "see",
+    "seen": "see",
+    "thought": "think",
+    "thinking": "think",
+    "knew": "know",
+    "known": "know",
+    "took": "take",
+    "taken": "take",
+    "gave": "give",
+    "given": "give",
+    "found": "find",
+    "left": "leave",
+    "felt": "feel",
+    "kept": "keep",
+    "held": "hold",
+    "bought": "buy",
+    "brought": "bring",
+    "became": "become",
+    "began": "begin",
+    "begun": "begin",
+    "ran": "run",
+    "wrote": "write",
+    "written": "write",
+    "spoke": "speak",
+    "spoken": "speak",
+    "sat": "sit",
+    "stood": "stand",
+    "led": "lead",
+    "lost": "lose",
+    "paid": "pay",
+    "met": "meet",
+    "men": "man",
+    "eyes": "eye",
+    # Pronouns
+    "me": "i",
+    "my": "i",
+    "mine": "i",
+    "us": "we",
+    "our": "we",
+    "ours": "we",
+    "him": "he",
+    "his": "he",
+    "her": "she",
+    "hers": "she",
+    "them": "they",
+    "their": "they",
+    "theirs": "they",
+    "you": "you",
+    "your": "you",
+    "yours": "you",
+}
 
 
-def lemmatize_simple(word: str, ngsl: set[str]) -> str:
+def build_lemma_map(ngsl: frozenset[str]) -> dict[str, str]:
+    """Map irregular and simply inflected forms to their NGSL lemma for one-lookup lemmatizing."""
+    # Rules are applied in priority order (irregulars, NGSL words themselves, then
+    # -ies, -es, -s, -ed, -d, -ing, e->ing); setdefault keeps the first match
+    lemma_map = dict(_IRREGULAR_MAP)
+    for lemma in ngsl:
+        lemma_map.setdefault(lemma, lemma)
+    for lemma in ngsl:
+        if lemma.endswith("y"):
+            lemma_map.setdefault(lemma[:-1] + "ies", lemma)
+    for lemma in ngsl:
+        lemma_map.setdefault(lemma + "es", lemma)
+    for lemma in ngsl:
+        if len(lemma) > 2:
+            lemma_map.setdefault(lemma + "s", lemma)
+    for lemma in ngsl:
+        if len(lemma) > 1:
+            lemma_map.setdefault(lemma + "ed", lemma)
+    for lemma in ngsl:
+        if lemma.endswith("e") and len(lemma) > 2:
+            lemma_map.setdefault(lemma + "d", lemma)
+    for lemma in ngsl:
+        if len(lemma) > 1:
+            lemma_map.setdefault(lemma + "ing", lemma)
+    for lemma in ngsl:
+        if lemma.endswith("e") and len(lemma) > 2:
+            lemma_map.setdefault(lemma[:-1] + "ing", lemma)
+    return lemma_map
+
+
+def lemmatize_simple(word: str, lemma_map: dict[str, str]) -> str:
     """Very small lemmatizer to map common inflections to lemmas for NGSL matching."""
-    if not word:
-        return word
-
-    # Irregulars and pronouns mapping
-    irregular_map = {
-        "was": "be",
-        "were": "be",
-        "been": "be",
-        "am": "be",
-        "is": "be",
-        "are": "be",
-        "has": "have",
-        "had": "have",
-        "did": "do",
-        "done": "do",
-        "does": "do",
-        "said": "say",
-        "made": "make",
-        "went": "go",
-        "gone": "go",
-        "goes": "go",
-        "got": "get",
-        "gotten": "get",
-        "came": "come",
-        "come": "come",
-        "told": "tell",
-        "saw": "see",
-        "seen": "see",
-        "thought": "think",
-        "thinking": "think",
-        "knew": "know",
-        "known": "know",
-        "took": "take",
-        "taken": "take",
-        "gave": "give",
-        "given": "give",
-        "found": "find",
-        "left": "leave",
-        "felt": "feel",
-        "kept": "keep",
-        "held": "hold",
-        "bought": "buy",
-        "brought": "bring",
-        "became": "become",
-        "began": "begin",
-        "begun": "begin",
-        "ran": "run",
-        "wrote": "write",
-        "written": "write",
-        "spoke": "speak",
-        "spoken": "speak",
-        "sat": "sit",
-        "stood": "stand",
-        "led": "lead",
-        "lost": "lose",
-        "paid": "pay",
-        "met": "meet",
-        "men": "man",
-        "eyes": "eye",
-        "eyes": "eye",
-        # Pronouns
-        "me": "i",
-        "my": "i",
-        "mine": "i",
-        "us": "we",
-        "our": "we",
-        "ours": "we",
-        "him": "he",
-        "his": "he",
-        "her": "she",
-        "hers": "she",
-        "them": "they",
-        "their": "they",
-        "theirs": "they",
-        "you": "you",
-        "your": "you",
-        "yours": "you",
-    }
-
-    if word in irregular_map:
-        return irregular_map[word]
-
-    # Try simple verb endings if resulting lemma exists in NGSL
-    candidates = [word]
-    if word.endswith("ies"):
-        candidates.append(word[:-3] + "y")
-    if word.endswith("es"):
-        candidates.append(word[:-2])
-    if word.endswith("s") and len(word) > 3:
-        candidates.append(word[:-1])
-    if word.endswith("ed") and len(word) > 3:
-        candidates.append(word[:-2])
-        candidates.append(word[:-1])
-    if word.endswith("ing") and len(word) > 4:
-        candidates.append(word[:-3])
-        candidates.append(word[:-3] + "e")
-
-    for cand in candidates:
-        if cand in ngsl:
-            return cand
-
-    return word
+    return lemma_map.get(word, word)
 
 
 def collect_word_result_files() -> list[str]:
@@ -231,58 +243,68 @@ def collect_word_result_files() -> list[str]:
 
 
 def parse_and_merge(paths: list[str]) -> list[tuple[str, float]]:
-    aggregate: dict[str, float] = {}
-    for p in paths:
-        for word, freq in parse_word_results(p):
-            aggregate[word] = aggregate.get(word, 0.0) + float(freq)
+    # Parse files in parallel worker processes; a single file isn't worth the startup cost
+    if len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as pool:
+            per_file = list(pool.map(parse_word_results, paths))
+    else:
+        per_file = [parse_word_results(p) for p in paths]
+
+    # Merge here, in one process
+    aggregate: defaultdict[str, float] = defaultdict(float)
+    for rows in per_file:
+        # parse_word_results already yields float frequencies
+        for word, freq in rows:
+            aggregate[word] += freq
     # Convert to list of tuples
     merged = list(aggregate.items())
     return merged
 
 
-input_files = collect_word_result_files()
-words_freq = parse_and_merge(input_files) if input_files else parse_word_results("Word_results.txt")
-ngsl_words = load_ngsl_set("NGSL_1.2_stats.csv")
-
 # Basic stoplist for function words and numerals not fully covered by NGSL
-stoplist = {
+stoplist = frozenset({
     "a", "an", "the", "and", "or", "but", "if", "so", "to", "of", "in", "on", "at", "by", "for", "from", "as",
     "i", "me", "my", "you", "your", "we", "our", "he", "him", "his", "she", "her", "it", "its", "they", "them", "their",
     "is", "am", "are", "was", "were", "be", "been", "being", "do", "did", "done", "have", "has", "had",
     "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten", "hundred", "thousand",
     "de", "s"
-}
+})
 
 # Frequency ceiling to drop frequent names/common tokens (tune as needed)
 FREQ_MAX = 1000.0
 
-rare_words: list[tuple[str, float]] = []
-for word, freq in words_freq:
-    # frequency filter first
-    if freq > FREQ_MAX:
-        continue
-    # normalize token and re-check
-    norm = normalize_word(word)
-    if not norm or len(norm) < 3:
-        continue
-    if norm in stoplist:
-        continue
-    # NGSL checks (surface and simple lemma)
-    if norm in ngsl_words:
-        continue
-    lemma = lemmatize_simple(norm, ngsl_words)
-    if lemma in ngsl_words:
-        continue
-    rare_words.append((norm, freq))
-
-# Sort by frequency ascending (rarest first)
-rare_words.sort(key=lambda pair: pair[1])
-
-with open("difficult_words.csv", "w", newline="", encoding="utf-8") as out_csv:
-    writer = csv.writer(out_csv)
-    writer.writerow(["Word"])
-    for word, _freq in rare_words:
-        writer.writerow([word])
-
-print(f"{len(rare_words)} difficult words saved to difficult_words.csv")
 
+def survivors(words_freq: list[tuple[str, float]], ngsl_words: frozenset[str]) -> Iterator[tuple[str, float]]:
+    """Yield (word, freq) pairs that pass the frequency, stoplist and NGSL filters."""
+    # Words arrive already normalized by parse_word_results, so they are not re-normalized here
+    # Filter the distinct words in bulk: one C-level set difference drops stoplist and
+    # NGSL surface forms, so only the remaining few go through the lemmatizer
+    candidates = {word for word, freq in words_freq if freq <= FREQ_MAX and len(word) >= 3}
+    candidates -= stoplist | ngsl_words
+    lemma_map = build_lemma_map(ngsl_words)
+    keep = {word for word in candidates if lemmatize_simple(word, lemma_map) not in ngsl_words}
+    for word, freq in words_freq:
+        if word in keep and freq <= FREQ_MAX:
+            yield word, freq
+
+
+def main() -> None:
+    input_files = collect_word_result_files()
+    words_freq = parse_and_merge(input_files) if input_files else parse_word_results("Word_results.txt")
+    ngsl_words = load_ngsl_set("NGSL_1.2_stats.csv")
+
+    # Sort by frequency ascending (rarest first)
+    rare_words = sorted(survivors(words_freq, ngsl_words), key=itemgetter(1))
+
+    # normalize_word limits words to a-z and "-", so nothing needs CSV quoting;
+    # write it all in one go with csv.writer's default \r\n line endings
+    lines = ["Word"]
+    lines.extend(word for word, _freq in rare_words)
+    with open("difficult_words.csv", "w", newline="", encoding="utf-8") as out_csv:
+        out_csv.write("\r\n".join(lines) + "\r\n")
+
+    print(f"{len(rare_words)} difficult words saved to difficult_words.csv")
+
+
+if __name__ == "__main__":
+    main()